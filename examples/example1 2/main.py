@@ -1,34 +1,31 @@
 import tensorflow as tf
 import numpy as np
 
-# TensorFlow 1.x session-based code
-sess = tf.Session()
+# Simple neural network using Keras layers
+model = tf.keras.Sequential([
+    tf.keras.layers.Dense(4, activation="relu"),
+    tf.keras.layers.Dense(1),
+])
 
-# Create placeholders
-x = tf.placeholder(tf.float32, [None, 2])
-y = tf.placeholder(tf.float32, [None, 1])
+# Optimizer
+optimizer = tf.keras.optimizers.Adam(0.01)
 
-# Simple neural network using tf.layers
-hidden = tf.layers.dense(x, 4, activation=tf.nn.relu)
-output = tf.layers.dense(hidden, 1)
 
-# Loss and optimizer
-loss = tf.reduce_mean(tf.square(output - y))
-optimizer = tf.train.AdamOptimizer(0.01).minimize(loss)
+@tf.function
+def train_step(x, y):
+    with tf.GradientTape() as tape:
+        loss = tf.reduce_mean(tf.square(model(x) - y))
+    gradients = tape.gradient(loss, model.trainable_variables)
+    optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+    return loss
 
-# Initialize variables
-sess.run(tf.global_variables_initializer())
 
-# Sample data
-X_data = np.random.random((100, 2))
-y_data = np.random.random((100, 1))
+# Sample data (converted once so the traced graph is reused every step)
+X_data = tf.constant(np.random.random((100, 2)), dtype=tf.float32)
+y_data = tf.constant(np.random.random((100, 1)), dtype=tf.float32)
 
 # Training loop
 for i in range(100):
-    _, loss_val = sess.run([optimizer, loss], 
-                          feed_dict={x: X_data, y: y_data})
+    loss_val = train_step(X_data, y_data)
     if i % 20 == 0:
-        print(f"Step {i}, Loss: {loss_val}")
-
-# Clean up
-sess.close()
+        print(f"Step {i}, Loss: {loss_val.numpy()}")
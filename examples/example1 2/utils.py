@@ -1,7 +1,6 @@
 import numpy as np
 
 def process_data(data):
-    # Using deprecated numpy functions
-    mean_val = np.asscalar(np.mean(data))
-    data_float = data.astype(np.float)
+    mean_val = float(np.mean(data))
+    data_float = data.astype(np.float32)
     return data_float, mean_val
\ No newline at end of file
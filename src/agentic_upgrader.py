@@ -1,12 +1,56 @@
-import llm_interface
-import validator
 import utils
 import report_generator
+import hashlib
 import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+# Fences are matched as opening/closing pairs: optional language tag, optional newline, body
+_CODE_FENCE = re.compile(r"```([\w+-]*)[ \t]*(\n)?(.*?)```", re.DOTALL)
+_PYTHON_FENCE_TAGS = frozenset({"python", "python3", "py"})
+_REPEATED_CANDIDATE_NOTE = "Your last answer repeated an earlier attempt unchanged; return a different fix."
+
+# One lock per project: candidates are written into the shared tree before validation, so
+# concurrent upgrades must not validate while another file holds an unvalidated candidate
+_PROJECT_LOCKS: Dict[str, threading.Lock] = {}
+_PROJECT_LOCKS_GUARD = threading.Lock()
+
+def _project_lock(path: str) -> threading.Lock:
+    root = os.getenv("ML_UPGRADER_PROJECT_ROOT") or os.path.dirname(path)
+    with _PROJECT_LOCKS_GUARD:
+        return _PROJECT_LOCKS.setdefault(os.path.abspath(root), threading.Lock())
+
+def apply_candidate(output_path: str, code: str) -> Tuple[bool, Optional[str]]:
+    """Write code to output_path and validate it, restoring the previous content if it fails"""
+    import validator
+
+    with _project_lock(output_path):
+        try:
+            with open(output_path, "rb") as fh:
+                previous = fh.read()
+        except FileNotFoundError:
+            previous = None
+
+        utils.write_file(output_path, code)
+        is_valid = False
+        try:
+            is_valid, error = validator.validate_code(output_path)
+        finally:
+            if not is_valid:
+                if previous is None:
+                    os.remove(output_path)
+                else:
+                    with open(output_path, "wb") as fh:
+                        fh.write(previous)
+        return is_valid, error
 
 def upgrade_file(input_path: str, output_path: str) -> report_generator.FileUpgradeResult:
     """Upgrade a single file with detailed tracking"""
-    
+    # Deferred so importing this module doesn't load the LLM SDKs or the validator
+    import llm_interface
+    import validator
+
     MAX_RETRIES = int(os.getenv("ML_UPGRADER_MAX_RETRIES", "5"))
     
     if not os.path.exists(input_path):
@@ -32,9 +76,12 @@ def upgrade_file(input_path: str, output_path: str) -> report_generator.FileUpgr
     old_code = utils.read_file(input_path)
     error = None
     current_code = old_code
+    seen_candidates = set()
+    repeated = False
 
     try:
-        precheck_valid, precheck_error = validator.validate_code(input_path)
+        with _project_lock(input_path):
+            precheck_valid, precheck_error = validator.validate_code(input_path)
         if not precheck_valid:
             error = precheck_error
     except Exception as exc:  # pragma: no cover - defensive, mirrors runtime loop handling
@@ -42,7 +89,11 @@ def upgrade_file(input_path: str, output_path: str) -> report_generator.FileUpgr
 
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            prompt = utils.build_prompt(current_code, error)
+            prompt_error = error
+            if repeated:
+                # Keep the real diagnosis and only nudge the model away from its last answer
+                prompt_error = f"{error}\n\n{_REPEATED_CANDIDATE_NOTE}" if error else _REPEATED_CANDIDATE_NOTE
+            prompt = utils.build_prompt(current_code, prompt_error)
             response = llm_interface.call_llm(prompt)
             new_code = clean_llm_response(response)
 
@@ -58,10 +109,17 @@ def upgrade_file(input_path: str, output_path: str) -> report_generator.FileUpgr
                 print(f"⚠️ {input_path} attempt {attempt} error: {error}")
                 continue
 
-            utils.write_file(output_path, new_code)
-            
-            # Validate the new code
-            is_valid, error = validator.validate_code(output_path)
+            # Identical candidates would fail validation the same way again
+            candidate_hash = hashlib.blake2b(stripped_code.encode("utf-8"), digest_size=16).digest()
+            if candidate_hash in seen_candidates:
+                repeated = True
+                print(f"⚠️ {input_path} attempt {attempt} error: LLM repeated previous candidate")
+                continue
+            seen_candidates.add(candidate_hash)
+            repeated = False
+
+            # Validate the new code (the file keeps its previous content if it fails)
+            is_valid, error = apply_candidate(output_path, new_code)
             
             if is_valid:
                 # Success! Generate final result
@@ -98,12 +156,20 @@ def upgrade_file(input_path: str, output_path: str) -> report_generator.FileUpgr
     )
 
 
-import re
-
 def clean_llm_response(response: str) -> str:
     """Extract the upgraded Python code from LLM response (strip markdown, explanations)"""
-    # Extract text inside the first ```python ... ```
-    match = re.search(r"```python\s*(.*?)```", response, re.DOTALL)
-    if match:
-        return match.group(1).strip()
+    # Prefer the first ```python block; fall back to the first untagged ``` block
+    untagged = None
+    for match in _CODE_FENCE.finditer(response):
+        tag, newline, body = match.groups()
+        if tag.lower() in _PYTHON_FENCE_TAGS:
+            return body.strip()
+        if untagged is None:
+            if not tag:
+                untagged = body
+            elif newline is None:
+                # Single-line bare fence such as ```import x```: the "tag" is code
+                untagged = match.group(0)[3:-3]
+    if untagged is not None:
+        return untagged.strip()
     return response.strip()
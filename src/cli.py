@@ -2,7 +2,6 @@ import argparse
 import os
 import sys
 from dotenv import load_dotenv
-import repo_upgrader 
 
 load_dotenv()
 
@@ -43,6 +42,12 @@ Examples:
         help="Maximum retry attempts per file (default: 5)"
     )
     
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Move the input repository to the output path instead of copying it (the input is consumed)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -63,6 +68,7 @@ Examples:
         sys.exit(1)
     
     # Handle .zip files
+    temp_dir = None
     if args.input_path.endswith('.zip'):
         print("📦 Extracting .zip file...")
         import tempfile
@@ -72,7 +78,13 @@ Examples:
         extract_path = os.path.join(temp_dir, "extracted")
         
         with zipfile.ZipFile(args.input_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_path)
+            # macOS metadata is never upgraded, so don't spend disk writes extracting it
+            members = [
+                name for name in zip_ref.namelist()
+                if not name.startswith('__MACOSX/')
+                and not os.path.basename(name.rstrip('/')).startswith('._')
+            ]
+            zip_ref.extractall(extract_path, members=members)
         
         args.input_path = extract_path
     
@@ -83,7 +95,10 @@ Examples:
         os.environ["ML_UPGRADER_MODEL"] = args.model
         os.environ["ML_UPGRADER_MAX_RETRIES"] = str(args.max_retries)
         
-        report_path = repo_upgrader.upgrade_repo(args.input_path, args.output_path)
+        # Imported here so --help and argument errors don't load the upgrade pipeline
+        import repo_upgrader
+        # An extracted .zip is scratch space, so it can always be moved rather than copied
+        report_path = repo_upgrader.upgrade_repo(args.input_path, args.output_path, in_place=args.in_place or temp_dir is not None)
         
         print(f"✅ Upgrade completed successfully!")
         print(f"📄 Report: {report_path}")
@@ -94,6 +109,10 @@ Examples:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if temp_dir:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,72 @@
 import os
 import re
-import ast
-from typing import Set
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Optional, Set
+
+try:  # Support both package and path-based execution
+    from .utils import iter_python_files  # type: ignore
+except ImportError:  # pragma: no cover
+    from utils import iter_python_files  # type: ignore
+
+# `from pkg.mod import ...` captures group 1, `import a.b as c, d` captures group 2;
+# statements may start a line or follow a `;`
+_IMPORT_STMT_RE = re.compile(
+    rb'(?:^|;)[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import\b|import[ \t]+([^\n#;]+))',
+    re.MULTILINE,
+)
+# Package name and version spec of a requirements line; trailing whitespace and comments are left alone
+_REQUIREMENT_LINE_RE = re.compile(r'(?m)^[ \t]*([a-zA-Z0-9_.-]+)([^\n#]*?)(?=[ \t\r]*(?:#|$))')
+_NAME_SEPARATOR_RE = re.compile(r'[-_.]+')
+
+# Below this many files, worker start-up costs more than scanning serially
+_PARALLEL_SCAN_MIN_FILES = 64
+
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+
+def canonicalize_name(name: str) -> str:
+    """PEP 503 normalisation, so scikit_learn and Scikit.Learn both map to scikit-learn"""
+    return _NAME_SEPARATOR_RE.sub('-', name).lower()
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file with one fstat + read, skipping the buffered file object"""
+    fd = os.open(path, _READ_FLAGS)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+
+def extract_imports(file_path: str) -> Set[str]:
+    """Return the top-level package names imported by a Python file.
+
+    Import statements are found with a line-anchored regex rather than an AST,
+    which avoids building a full tree per file and still picks up imports from
+    legacy sources that no longer parse (e.g. Python 2 print statements).
+
+    Pure function of its arguments (no updater state), so callers can map it
+    over files with any concurrent.futures executor.
+    """
+    imports = set()
+    try:
+        source = _read_bytes(file_path)
+    except OSError:
+        return imports
+
+    for from_module, import_list in _IMPORT_STMT_RE.findall(source):
+        if from_module:
+            # Relative imports: `from .mod import x` -> mod, `from . import x` -> skipped
+            names = [from_module.lstrip(b'.')]
+        else:
+            names = [part.split(None, 1)[0] for part in import_list.split(b',') if part.strip()]
+        for name in names:
+            top_level = name.split(b'.', 1)[0]
+            if top_level:
+                imports.add(top_level.decode('ascii', 'ignore'))
+    return imports
+
 
 class SmartDependencyUpdater:
     """Intelligently detects and updates USED dependencies in requirements.txt and setup.py"""
@@ -25,80 +90,88 @@ class SmartDependencyUpdater:
         'cv2': '>=4.8.0',
     }
 
+    # All dependencies in one alternation (longest first, so torchvision wins over torch);
+    # separators match any run of -_. so spellings like scikit_learn are recognised
+    _SETUP_DEP_PATTERN = re.compile(
+        r'(["\'])('
+        + '|'.join(
+            '[-_.]+'.join(map(re.escape, _NAME_SEPARATOR_RE.split(dep)))
+            for dep in sorted(ML_DEPENDENCIES, key=len, reverse=True)
+        )
+        + r')(?![\w.-])[>=<!=]*[^"\',]*(["\'])',
+        re.IGNORECASE,
+    )
+
     def __init__(self):
         self.updated_deps = []
         self.detected_imports = set()
 
-    def scan_project_imports(self, repo_path: str) -> Set[str]:
+    def scan_project_imports(self, repo_path: str, python_files: Optional[Iterable[str]] = None) -> Set[str]:
         """Scan all Python files to detect actual imports used"""
         all_imports = set()
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    imports = self._extract_imports_from_file(file_path)
-                    all_imports.update(imports)
+        if python_files is None:
+            python_files = iter_python_files(repo_path)
+        file_paths = list(python_files)
+        if len(file_paths) >= _PARALLEL_SCAN_MIN_FILES:
+            try:
+                with ProcessPoolExecutor() as executor:
+                    for imports in executor.map(extract_imports, file_paths, chunksize=32):
+                        all_imports.update(imports)
+                file_paths = []
+            except (OSError, BrokenProcessPool):
+                all_imports.clear()  # fall back to the serial scan below
+        for file_path in file_paths:
+            all_imports.update(extract_imports(file_path))
         print(f"📦 Detected imports: {sorted(all_imports)}")
         self.detected_imports = all_imports
         return all_imports
 
-    def _extract_imports_from_file(self, file_path: str) -> Set[str]:
-        imports = set()
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                tree = ast.parse(f.read())
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.add(alias.name.split('.')[0])
-                elif isinstance(node, ast.ImportFrom) and node.module:
-                    imports.add(node.module.split('.')[0])
-        except (SyntaxError, UnicodeDecodeError, OSError):
-            pass
-        return imports
+    def update_requirements_txt(self, repo_path: str, python_files: Optional[Iterable[str]] = None) -> bool:
+        """Update or create requirements.txt with detected dependencies
 
-    def update_requirements_txt(self, repo_path: str) -> bool:
-        """Update or create requirements.txt with detected dependencies"""
+        Pass python_files when the caller has already walked the repo to skip a second walk.
+        """
         req_path = os.path.join(repo_path, 'requirements.txt')
-        self.scan_project_imports(repo_path)
+        self.scan_project_imports(repo_path, python_files)
         seen_packages = set()
-        updated_lines = []
 
+        def _substitute(match):
+            pkg_name = canonicalize_name(match.group(1))
+            seen_packages.add(pkg_name)
+            if pkg_name not in self.ML_DEPENDENCIES:
+                return match.group(0)
+            old_line = match.group(0).strip()
+            new_line = f"{pkg_name}{self.ML_DEPENDENCIES[pkg_name]}"
+            if old_line != new_line:
+                self.updated_deps.append(f"{old_line} → {new_line}")
+            return new_line
+
+        content = None
         if os.path.exists(req_path):
             with open(req_path, 'r') as f:
-                lines = f.readlines()
-            for line in lines:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    updated_lines.append(line + '\n')
-                    continue
-                pkg_match = re.match(r'^([a-zA-Z0-9_-]+)', line)
-                if not pkg_match:
-                    updated_lines.append(line + '\n')
-                    continue
-                pkg_name = pkg_match.group(1).lower()
-                seen_packages.add(pkg_name)
-
-                if pkg_name in self.ML_DEPENDENCIES:
-                    new_version = self.ML_DEPENDENCIES[pkg_name]
-                    new_line = f"{pkg_name}{new_version}"
-                    updated_lines.append(new_line + '\n')
-                    self.updated_deps.append(f"{line} → {new_line}")
-                else:
-                    updated_lines.append(line + '\n')
-        else:
-            updated_lines.append("# Auto-generated requirements.txt\n")
+                content = f.read()
+        updated_content = _REQUIREMENT_LINE_RE.sub(_substitute, content or "")
 
         # Add missing detected deps
-        for imp in self.detected_imports:
-            imp = imp.lower()
-            if imp in self.ML_DEPENDENCIES and imp not in seen_packages:
-                new_line = f"{imp}{self.ML_DEPENDENCIES[imp]}"
-                updated_lines.append(new_line + '\n')
-                self.updated_deps.append(f"Added: {new_line}")
+        added = [
+            f"{imp}{self.ML_DEPENDENCIES[imp]}"
+            for imp in sorted({canonicalize_name(imp) for imp in self.detected_imports})
+            if imp in self.ML_DEPENDENCIES and imp not in seen_packages
+        ]
+        if added:
+            if content is None:
+                updated_content = "# Auto-generated requirements.txt\n"
+            elif updated_content and not updated_content.endswith('\n'):
+                updated_content += '\n'
+            updated_content += "".join(f"{line}\n" for line in added)
+            self.updated_deps.extend(f"Added: {line}" for line in added)
+
+        if updated_content == (content or ""):
+            print("ℹ️ requirements.txt already up-to-date.")
+            return False
 
         with open(req_path, 'w') as f:
-            f.writelines(updated_lines)
+            f.write(updated_content)
 
         print(f"✅ requirements.txt updated with {len(self.updated_deps)} changes")
         return True
@@ -114,14 +187,19 @@ class SmartDependencyUpdater:
         with open(setup_path, 'r') as f:
             content = f.read()
 
-        updated_content = content
-        for dep, version in self.ML_DEPENDENCIES.items():
-            pattern = rf'(["\']){dep}[>=<!=]*[^"\',]*(["\'])'
-            replacement = rf'\1{dep}{version}\2'
-            new_content = re.sub(pattern, replacement, updated_content, flags=re.IGNORECASE)
-            if new_content != updated_content:
-                self.updated_deps.append(f"Updated {dep} in setup.py → {version}")
-                updated_content = new_content
+        updated = {}
+
+        def _substitute(match):
+            quote, name, closing = match.groups()
+            dep = canonicalize_name(name)
+            version = self.ML_DEPENDENCIES[dep]
+            replacement = f"{quote}{dep}{version}{closing}"
+            if replacement != match.group(0):
+                updated[dep] = version
+            return replacement
+
+        updated_content = self._SETUP_DEP_PATTERN.sub(_substitute, content)
+        self.updated_deps.extend(f"Updated {dep} in setup.py → {version}" for dep, version in updated.items())
 
         if updated_content != content:
             with open(setup_path, 'w') as f:
@@ -131,3 +209,7 @@ class SmartDependencyUpdater:
 
         print("ℹ️ setup.py already up-to-date.")
         return False
+
+
+# Name used by repo_upgrader and the tests
+DependencyUpdater = SmartDependencyUpdater
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Optional
 import openai
 from dotenv import load_dotenv
@@ -26,11 +27,22 @@ def _extract_content(response) -> str:
     return content  # type: ignore[return-value]
 
 
+# Clients are cached per credential so back-to-back calls reuse one HTTP connection pool
+@lru_cache(maxsize=None)
+def _together_client(api_key: str) -> Together:
+    return Together(api_key=api_key)
+
+
+@lru_cache(maxsize=None)
+def _openrouter_client(api_key: str, base_url: str) -> openai.OpenAI:
+    return openai.OpenAI(api_key=api_key, base_url=base_url)
+
+
 def _generate_together(prompt: str, model: Optional[str] = None) -> str:
     api_key = _require_env("TOGETHER_API_KEY")
     model_name = model or os.getenv("TOGETHER_MODEL", DEFAULT_TOGETHER_MODEL)
 
-    client = Together(api_key=api_key)
+    client = _together_client(api_key)
     response = client.chat.completions.create(
         model=model_name,
         messages=[{"role": "user", "content": prompt}],
@@ -43,7 +55,7 @@ def _generate_openrouter(prompt: str, model: Optional[str] = None) -> str:
     model_name = model or os.getenv("OPENROUTER_MODEL", DEFAULT_OPENROUTER_MODEL)
     base_url = os.getenv("OPENROUTER_BASE_URL", DEFAULT_OPENROUTER_BASE_URL)
 
-    client = openai.OpenAI(api_key=api_key, base_url=base_url)
+    client = _openrouter_client(api_key, base_url)
     response = client.chat.completions.create(
         model=model_name,
         messages=[{"role": "user", "content": prompt}],
@@ -1,75 +1,178 @@
+import dataclasses
+import hashlib
+import json
 import os
-import shutil
-import agentic_upgrader
-import dependency_upgrader
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 import report_generator
-from typing import List
+import utils
+from typing import Iterator, List, Optional
 
-def upgrade_repo(old_repo: str, new_repo: str) -> str:
+# Settings that change what the LLM is asked for or how candidates are validated
+_CACHE_ENV_KEYS = (
+    "ML_UPGRADER_MODEL",
+    "OPENROUTER_MODEL",
+    "OPENROUTER_BASE_URL",
+    "TOGETHER_MODEL",
+    "ML_UPGRADER_RUNTIME_COMMAND",
+)
+
+class _UpgradeCache:
+    """Successful upgrades on disk, keyed by file name + content and the upgrade settings.
+
+    Hits are re-validated in the current project before they are reported as upgraded.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        settings = [utils.build_prompt("")] + [os.getenv(key, "") for key in _CACHE_ENV_KEYS]
+        self.params_hash = hashlib.sha256("\0".join(settings).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_env(cls) -> Optional["_UpgradeCache"]:
+        if os.getenv("ML_UPGRADER_DISABLE_CACHE", "").strip().lower() in {"1", "true", "yes", "on"}:
+            return None
+        root = os.getenv("ML_UPGRADER_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "ml-upgrader")
+        try:
+            os.makedirs(root, exist_ok=True)
+        except OSError:
+            return None
+        return cls(root)
+
+    def _entry(self, file_path: str, source: bytes) -> str:
+        digest = hashlib.sha256(os.path.basename(file_path).encode("utf-8") + b"\0" + source).hexdigest()
+        return os.path.join(self.root, f"{digest}-{self.params_hash}")
+
+    def load(self, file_path: str, source: bytes) -> Optional[report_generator.FileUpgradeResult]:
+        entry = self._entry(file_path, source)
+        try:
+            with open(entry + ".json", "r", encoding="utf-8") as fh:
+                fields = json.load(fh)
+            with open(entry + ".py", "rb") as fh:
+                upgraded = fh.read().decode("utf-8")
+            # A restored file costs no LLM calls, so it must not inflate the report's totals
+            result = report_generator.FileUpgradeResult(**{**fields, "file_path": file_path, "attempts": 0})
+        except (OSError, ValueError, TypeError):
+            return None
+        if not result.success:
+            return None
+
+        import agentic_upgrader
+        # The entry may have been validated against a different project or runtime config
+        is_valid, error = agentic_upgrader.apply_candidate(file_path, upgraded)
+        if not is_valid:
+            print(f"ℹ️ Cached upgrade of {file_path} no longer validates, upgrading again: {error}")
+            return None
+        print(f"♻️ {file_path} restored from upgrade cache")
+        return result
+
+    def store(self, source: bytes, result: report_generator.FileUpgradeResult) -> None:
+        entry = self._entry(result.file_path, source)
+        try:
+            with open(result.file_path, "rb") as fh:
+                upgraded = fh.read()
+            # Write to temp names first so concurrent readers never see a partial entry
+            for suffix, data in ((".py", upgraded), (".json", json.dumps(dataclasses.asdict(result)).encode("utf-8"))):
+                tmp_path = f"{entry}{suffix}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp_path, entry + suffix)
+        except OSError as exc:
+            print(f"⚠️ Could not cache upgrade of {result.file_path}: {exc}")
+
+@contextmanager
+def _scoped_env(key: str, value: str) -> Iterator[None]:
+    """Set an environment variable for the duration of the block, then restore it"""
+    previous = os.environ.get(key)
+    os.environ[key] = value
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = previous
+
+def _upgrade_one(file_path: str, cache: Optional[_UpgradeCache] = None) -> report_generator.FileUpgradeResult:
+    try:
+        source = None
+        if cache is not None:
+            with open(file_path, "rb") as fh:
+                source = fh.read()
+            cached = cache.load(file_path, source)
+            if cached is not None:
+                return cached
+
+        import agentic_upgrader  # deferred with the LLM/validator stack it pulls in
+        result = agentic_upgrader.upgrade_file(file_path, file_path)
+        # Only validated upgrades are reused; failures get a fresh attempt next run
+        if source is not None and result.success:
+            cache.store(source, result)
+        return result
+    except Exception as e:
+        print(f"⚠️ Error upgrading {file_path}: {e}")
+        # Failed files still get an entry in the report
+        return report_generator.FileUpgradeResult(
+            file_path=file_path,
+            success=False,
+            attempts=0,
+            api_changes=[],
+            error=str(e)
+        )
+
+def upgrade_repo(old_repo: str, new_repo: str, in_place: bool = False) -> str:
     """
     Upgrade entire repository with comprehensive reporting
     Returns path to generated report
+
+    With in_place=True, old_repo is moved to new_repo (no longer existing afterwards)
+    instead of copied, falling back to a copy when they are on different filesystems.
     """
     
-    previous_project_root = os.getenv("ML_UPGRADER_PROJECT_ROOT")
-    os.environ["ML_UPGRADER_PROJECT_ROOT"] = new_repo
+    with _scoped_env("ML_UPGRADER_PROJECT_ROOT", new_repo):
+        import dependency_upgrader  # only needed once an upgrade actually runs
 
-    try:
         # Initialize components
         report_generator_instance = report_generator.UpgradeReportGenerator()
         dependency_updater_instance = dependency_upgrader.DependencyUpdater()
         
         # Setup output directory
-        if os.path.exists(new_repo):
-            shutil.rmtree(new_repo)
-        shutil.copytree(old_repo, new_repo)
+        try:
+            utils.remove_tree(new_repo)
+        except FileNotFoundError:
+            pass
+        moved = False
+        if in_place:
+            try:
+                os.rename(old_repo, new_repo)
+                moved = True
+            except OSError:
+                pass  # e.g. cross-device; copy instead
+        if not moved:
+            utils.copy_tree(old_repo, new_repo)
         
         print(f"Starting repo upgrade: {old_repo} → {new_repo}")
         
+        # Walk the copied tree once (pruning __pycache__/__MACOSX and ._ files) and share the result
+        python_files = list(utils.iter_python_files(new_repo))
+
         # Update dependencies
         print("📦 Updating dependencies...")
-        dependency_updater_instance.update_requirements_txt(new_repo)
+        dependency_updater_instance.update_requirements_txt(new_repo, python_files)
         dependency_updater_instance.update_setup_py(new_repo)
         report_generator_instance.add_dependency_changes(dependency_updater_instance.updated_deps)
         
         # Upgrade Python files
-        python_files = []
-        for root, _, files in os.walk(new_repo):
-            for f in files:
-                if f.endswith(".py"):
-                    python_files.append(os.path.join(root, f))
-        
         print(f"🔄 Upgrading {len(python_files)} Python files...")
         
-        for file_path in python_files:
-            try:
-                # Skip __pycache__ and other generated files
-                if '__pycache__' in file_path or '.pyc' in file_path:
-                    continue
-
-                filename = os.path.basename(file_path)
-                rel_path = os.path.relpath(file_path, new_repo)
-                if filename.startswith('._'):
-                    print(f"ℹ️ Skipping macOS resource fork file: {rel_path}")
-                    continue
-                if os.sep + '__MACOSX' + os.sep in file_path or rel_path.startswith('__MACOSX'):
-                    print(f"ℹ️ Skipping macOS metadata file: {rel_path}")
-                    continue
-
-                result = agentic_upgrader.upgrade_file(file_path, file_path)
-                report_generator_instance.add_file_result(result)
-                
-            except Exception as e:
-                print(f"⚠️ Error upgrading {file_path}: {e}")
-                # Add failed result to report
-                result = report_generator.FileUpgradeResult(
-                    file_path=file_path,
-                    success=False,
-                    attempts=0,
-                    api_changes=[],
-                    error=str(e)
-                )
-                report_generator_instance.add_file_result(result)
+        # LLM round-trips dominate, so keep several files in flight at once
+        max_workers = max(1, int(os.getenv("ML_UPGRADER_MAX_WORKERS", "4")))
+        upgrade_one = partial(_upgrade_one, cache=_UpgradeCache.from_env())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            file_results: List[report_generator.FileUpgradeResult] = list(executor.map(upgrade_one, python_files))
+        report_generator_instance.add_file_results(file_results)
         
         # Generate report
         report_path = os.path.join(new_repo, "UPGRADE_REPORT.md")
@@ -82,8 +185,3 @@ def upgrade_repo(old_repo: str, new_repo: str) -> str:
         print(f"📄 Report generated: {report_path}")
         
         return report_path
-    finally:
-        if previous_project_root is None:
-            os.environ.pop("ML_UPGRADER_PROJECT_ROOT", None)
-        else:
-            os.environ["ML_UPGRADER_PROJECT_ROOT"] = previous_project_root
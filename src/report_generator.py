@@ -25,6 +25,10 @@ class UpgradeReportGenerator:
         """Add a file upgrade result"""
         self.results.append(result)
     
+    def add_file_results(self, results: List[FileUpgradeResult]):
+        """Add several file upgrade results at once"""
+        self.results.extend(results)
+    
     def add_dependency_changes(self, changes: List[str]):
         """Add dependency update changes"""
         self.dependency_changes.extend(changes)
@@ -37,7 +41,7 @@ class UpgradeReportGenerator:
         successful = [r for r in self.results if r.success]
         failed = [r for r in self.results if not r.success]
         
-        report = f"""# ML Repository Upgrade Report
+        parts = [f"""# ML Repository Upgrade Report
 
 **Generated:** {end_time.strftime('%Y-%m-%d %H:%M:%S')}  
 **Duration:** {duration.total_seconds():.1f} seconds  
@@ -49,54 +53,54 @@ class UpgradeReportGenerator:
 
 {len(successful)}/{len(self.results)} files upgraded successfully ({len(successful)/len(self.results)*100:.1f}%).
 
-"""
+"""]
 
         # Dependency updates
         if self.dependency_changes:
-            report += "## Dependency Updates\n\n"
+            parts.append("## Dependency Updates\n\n")
             for change in self.dependency_changes:
-                report += f"- {change}\n"
-            report += "\n"
+                parts.append(f"- {change}\n")
+            parts.append("\n")
 
         # Successful upgrades
         if successful:
-            report += "## ✅ Successfully Upgraded Files\n\n"
+            parts.append("## ✅ Successfully Upgraded Files\n\n")
             for result in successful:
-                report += f"### `{result.file_path}`\n\n"
-                report += f"- **Attempts:** {result.attempts}\n"
+                parts.append(f"### `{result.file_path}`\n\n")
+                parts.append(f"- **Attempts:** {result.attempts}\n")
                 
                 if result.api_changes:
-                    report += "- **API Changes:**\n"
+                    parts.append("- **API Changes:**\n")
                     for change in result.api_changes:
-                        report += f"  - {change}\n"
+                        parts.append(f"  - {change}\n")
                 
                 if result.diff:
-                    report += "\n**Changes:**\n```diff\n"
+                    parts.append("\n**Changes:**\n```diff\n")
                     # Limit diff to first 20 lines to keep report readable
-                    diff_lines = result.diff.split('\n')[:20]
-                    report += '\n'.join(diff_lines)
-                    if len(result.diff.split('\n')) > 20:
-                        diff_lines_count = len(result.diff.split('\n')) - 20
-                        report += f"\n... ({diff_lines_count} more lines)"
-                    report += "\n```\n\n"
+                    diff_lines = result.diff.split('\n')
+                    parts.append('\n'.join(diff_lines[:20]))
+                    if len(diff_lines) > 20:
+                        diff_lines_count = len(diff_lines) - 20
+                        parts.append(f"\n... ({diff_lines_count} more lines)")
+                    parts.append("\n```\n\n")
                 else:
-                    report += "\n"
+                    parts.append("\n")
 
         # Failed upgrades
         if failed:
-            report += "## ❌ Failed Upgrades\n\n"
+            parts.append("## ❌ Failed Upgrades\n\n")
             for result in failed:
-                report += f"### `{result.file_path}`\n\n"
-                report += f"- **Attempts:** {result.attempts}\n"
-                report += f"- **Error:** {result.error}\n\n"
+                parts.append(f"### `{result.file_path}`\n\n")
+                parts.append(f"- **Attempts:** {result.attempts}\n")
+                parts.append(f"- **Error:** {result.error}\n\n")
 
         # Statistics
-        report += "## 📊 Statistics\n\n"
+        parts.append("## 📊 Statistics\n\n")
         total_attempts = sum(r.attempts for r in self.results)
         avg_attempts = total_attempts / len(self.results) if self.results else 0
         
-        report += f"- **Average attempts per file:** {avg_attempts:.1f}\n"
-        report += f"- **Total LLM calls:** {total_attempts}\n"
+        parts.append(f"- **Average attempts per file:** {avg_attempts:.1f}\n")
+        parts.append(f"- **Total LLM calls:** {total_attempts}\n")
         
         # API change frequency
         all_changes = []
@@ -108,29 +112,29 @@ class UpgradeReportGenerator:
             for change in all_changes:
                 change_counts[change] = change_counts.get(change, 0) + 1
             
-            report += "\n**Most common API changes:**\n"
+            parts.append("\n**Most common API changes:**\n")
             sorted_changes = sorted(change_counts.items(), key=lambda x: x[1], reverse=True)
             for change, count in sorted_changes[:5]:
-                report += f"- {change} ({count} files)\n"
+                parts.append(f"- {change} ({count} files)\n")
 
         # Manual review section
         if failed:
-            report += "\n## Manual Review Needed\n\n"
-            report += "The following files failed automatic upgrade and require manual attention:\n\n"
+            parts.append("\n## Manual Review Needed\n\n")
+            parts.append("The following files failed automatic upgrade and require manual attention:\n\n")
             for i, result in enumerate(failed, 1):
                 short_path = os.path.basename(result.file_path)
-                report += f"{i}. **`{short_path}`** - {result.error}\n"
+                parts.append(f"{i}. **`{short_path}`** - {result.error}\n")
 
         # Recommendations
-        report += "\n## 💡 Recommendations\n\n"
+        parts.append("\n## 💡 Recommendations\n\n")
         if successful:
-            report += f"1. **Immediate Use**: The {len(successful)} successfully upgraded files are ready to use with modern ML libraries\n"
-        report += "2. **Testing**: Run your existing test suite to verify functionality\n"
+            parts.append(f"1. **Immediate Use**: The {len(successful)} successfully upgraded files are ready to use with modern ML libraries\n")
+        parts.append("2. **Testing**: Run your existing test suite to verify functionality\n")
         if failed:
-            report += "3. **Manual Migration**: Review failed files for manual upgrade opportunities\n"
-        report += "4. **Incremental Adoption**: Consider upgrading successfully migrated modules first\n"
+            parts.append("3. **Manual Migration**: Review failed files for manual upgrade opportunities\n")
+        parts.append("4. **Incremental Adoption**: Consider upgrading successfully migrated modules first\n")
 
         # Write report
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         with open(output_path, 'w') as f:
-            f.write(report)
+            f.write("".join(parts))
@@ -176,11 +176,7 @@ def _load_runtime_config(project_root: str) -> Tuple[Dict[str, Any], Optional[st
     for name in RUNTIME_CONFIG_FILENAMES:
         candidate_paths.append(os.path.join(project_root, name))
 
-    seen = set()
-    for path in candidate_paths:
-        if not path or path in seen:
-            continue
-        seen.add(path)
+    for path in dict.fromkeys(filter(None, candidate_paths)):
         if os.path.isfile(path):
             try:
                 with open(path, "r", encoding="utf-8") as fh:
@@ -716,6 +712,3 @@ def _save_marker(path: str, data: Dict[str, Any]) -> None:
             json.dump(data, fh)
     except OSError:
         pass
-
-
-perform_runtime_validation("/Users/sandeephirani/Pictures/Inputs/input/main.py")
@@ -1,7 +1,28 @@
 import os
 import re
+import shutil
+import subprocess
+import sys
 import difflib
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple, Optional
+
+# Printable ASCII plus common whitespace/control characters found in source files
+_TEXT_CHARS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7F)))
+
+# Directories that never contain project sources worth scanning
+# (hidden directories such as .git or .mypy_cache are pruned as well)
+SKIP_DIRS = frozenset({
+    "__pycache__",
+    "__MACOSX",
+    ".git",
+    ".venv",
+    "venv",
+    ".ml_upgrader_venv",
+    "node_modules",
+    ".mypy_cache",
+    ".pytest_cache",
+})
 
 def read_file(path: str) -> str:
     """Read file content with encoding handling"""
@@ -19,6 +40,89 @@ def write_file(path: str, content: str) -> None:
         f.write(content)
 
 
+def iter_python_files(root: str) -> Iterator[str]:
+    """Yield .py files under root (minus macOS ._ resource forks), pruning SKIP_DIRS without descending into them"""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                yield from iter_python_files(entry.path)
+        elif entry.name.endswith(".py") and not entry.name.startswith("._"):
+            yield entry.path
+
+
+def copy_tree(src: str, dst: str) -> None:
+    """Copy src to a new dst, using copy-on-write clones where the filesystem supports them"""
+    # -L copies symlink targets like shutil.copytree(symlinks=False), so in-place upgrades
+    # never write through a link to a file outside dst
+    if sys.platform.startswith("linux"):
+        cmd = ["cp", "-aL", "--reflink=auto", os.path.join(src, "."), dst]
+    elif sys.platform == "darwin":
+        cmd = ["cp", "-c", "-R", "-L", os.path.join(src, "."), dst]
+    else:
+        cmd = None
+
+    if cmd:
+        os.makedirs(dst)  # like copytree, refuse to merge into an existing directory
+        try:
+            if subprocess.run(cmd, capture_output=True).returncode == 0:
+                return
+        except OSError:
+            pass
+        shutil.rmtree(dst, ignore_errors=True)
+
+    # Directories are created up front and only the file copies fan out. Directory
+    # permissions are applied deepest-first after every copy lands, so a read-only
+    # source directory cannot block writes into its own copy
+    os.makedirs(dst)
+    directories = []
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        pending = []
+        for root, dirnames, filenames in os.walk(src, followlinks=True):
+            target = os.path.join(dst, os.path.relpath(root, src))
+            os.makedirs(target, exist_ok=True)
+            directories.append((root, target))
+            for name in filenames:
+                pending.append(executor.submit(shutil.copy2, os.path.join(root, name), os.path.join(target, name)))
+        for future in pending:
+            future.result()
+    for src_dir, dst_dir in reversed(directories):
+        shutil.copystat(src_dir, dst_dir)
+
+
+def remove_tree(path: str) -> None:
+    """Delete a directory tree; ML_UPGRADER_FAST_RMTREE=1 unlinks files on a thread pool"""
+    if os.getenv("ML_UPGRADER_FAST_RMTREE") != "1":
+        shutil.rmtree(path)
+        return
+    if os.path.islink(path):
+        raise OSError("Cannot call remove_tree on a symbolic link")
+
+    # Parents are recorded before their children, so rmdir in reverse order is post-order
+    directories = []
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        pending = []
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            directories.append(current)
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        pending.append(executor.submit(os.unlink, entry.path))
+        for future in pending:
+            future.result()
+    for directory in reversed(directories):
+        os.rmdir(directory)
+
+
 def is_probably_binary(path: str, sample_size: int = 2048) -> bool:
     """Heuristic to detect binary files (null bytes or low text ratio)."""
     try:
@@ -33,9 +137,8 @@ def is_probably_binary(path: str, sample_size: int = 2048) -> bool:
     if b"\x00" in sample:
         return True
 
-    text_chars = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7F)))
-    text_set = set(text_chars)
-    text_count = sum(1 for byte in sample if byte in text_set)
+    # translate() strips the text bytes in C; whatever is left is non-text
+    text_count = len(sample) - len(sample.translate(None, _TEXT_CHARS))
     ratio = text_count / len(sample)
     return ratio < 0.85
 
@@ -100,27 +203,43 @@ def build_prompt_best(code: str, error: Optional[str] = None) -> str:
         )
 
 
+_BUILD_PROMPT_BASE = (
+    "You are an expert Python ML code migration assistant.\n"
+    "Upgrade the following Python code to be fully compatible with the latest stable version(s) "
+    "of ONLY the libraries it already uses.\n\n"
+    "⚠️ RULES:\n"
+    "- Do NOT convert between frameworks (e.g., keep TensorFlow code in TensorFlow, PyTorch in PyTorch).\n"
+    "- Do NOT add new frameworks unless already imported in the code.\n"
+    "- Preserve all functionality and logic exactly.\n"
+    "- Apply only necessary migrations (remove deprecated APIs, update function signatures, fix types).\n"
+    "- Always return the ENTIRE corrected code.\n"
+    "```python\n"
+    "# upgraded code here\n"
+    "```"
+)
+
+# Common API patterns to detect, compiled once for every extract_api_changes call
+_API_CHANGE_PATTERNS = tuple(
+    (re.compile(pattern), description)
+    for pattern, description in (
+        (r'tf\.Session\(\)', 'Removed tf.Session (TF 1.x → 2.x)'),
+        (r'tf\.placeholder', 'Replaced tf.placeholder with tf.Variable or function parameters'),
+        (r'np\.asscalar', 'Replaced np.asscalar with .item()'),
+        (r'torch\.cuda\.FloatTensor', 'Updated torch.cuda.FloatTensor to modern tensor creation'),
+        (r'tf\.get_variable', 'Replaced tf.get_variable with tf.Variable'),
+        (r'tf\.layers\.', 'Migrated tf.layers to tf.keras.layers'),
+        (r'tf\.contrib\.', 'Removed tf.contrib (deprecated in TF 2.x)'),
+        (r'np\.int\b', 'Replaced np.int with int'),
+        (r'np\.float\b', 'Replaced np.float with float'),
+        (r'torch\.autograd\.Variable', 'Removed torch.autograd.Variable (no longer needed)'),
+    )
+)
+
 def build_prompt(code: str, error: Optional[str] = None) -> str:
     """Build prompt for LLM to upgrade ML/NumPy code in-place without mixing frameworks"""
-    
-    base_prompt = (
-        "You are an expert Python ML code migration assistant.\n"
-        "Upgrade the following Python code to be fully compatible with the latest stable version(s) "
-        "of ONLY the libraries it already uses.\n\n"
-        "⚠️ RULES:\n"
-        "- Do NOT convert between frameworks (e.g., keep TensorFlow code in TensorFlow, PyTorch in PyTorch).\n"
-        "- Do NOT add new frameworks unless already imported in the code.\n"
-        "- Preserve all functionality and logic exactly.\n"
-        "- Apply only necessary migrations (remove deprecated APIs, update function signatures, fix types).\n"
-        "- Always return the ENTIRE corrected code.\n"
-        "```python\n"
-        "# upgraded code here\n"
-        "```"
-    )
-    
     if error:
         return (
-            f"{base_prompt}\n\n"
+            f"{_BUILD_PROMPT_BASE}\n\n"
             "The previously upgraded code failed with this error:\n"
             f"{error}\n\n"
             "Please fix the issue and return the full corrected file.\n\n"
@@ -128,7 +247,7 @@ def build_prompt(code: str, error: Optional[str] = None) -> str:
         )
     else:
         return (
-            f"{base_prompt}\n\n"
+            f"{_BUILD_PROMPT_BASE}\n\n"
             "Code to upgrade:\n"
             f"{code}\n"
         )
@@ -136,23 +255,8 @@ def build_prompt(code: str, error: Optional[str] = None) -> str:
 def extract_api_changes(old_code: str, new_code: str) -> List[str]:
     """Extract API changes between old and new code"""
     changes = []
-    
-    # Common API patterns to detect
-    patterns = {
-        r'tf\.Session\(\)': 'Removed tf.Session (TF 1.x → 2.x)',
-        r'tf\.placeholder': 'Replaced tf.placeholder with tf.Variable or function parameters',
-        r'np\.asscalar': 'Replaced np.asscalar with .item()',
-        r'torch\.cuda\.FloatTensor': 'Updated torch.cuda.FloatTensor to modern tensor creation',
-        r'tf\.get_variable': 'Replaced tf.get_variable with tf.Variable',
-        r'tf\.layers\.': 'Migrated tf.layers to tf.keras.layers',
-        r'tf\.contrib\.': 'Removed tf.contrib (deprecated in TF 2.x)',
-        r'np\.int\b': 'Replaced np.int with int',
-        r'np\.float\b': 'Replaced np.float with float',
-        r'torch\.autograd\.Variable': 'Removed torch.autograd.Variable (no longer needed)',
-    }
-    
-    for pattern, description in patterns.items():
-        if re.search(pattern, old_code) and not re.search(pattern, new_code):
+    for pattern, description in _API_CHANGE_PATTERNS:
+        if pattern.search(old_code) and not pattern.search(new_code):
             changes.append(description)
     
     return changes
@@ -0,0 +1,33 @@
+import pytest
+from src.agentic_upgrader import clean_llm_response
+
+class TestCleanLlmResponse:
+    
+    def test_python_block_after_other_block(self):
+        """Test the python block wins over an earlier shell block"""
+        response = (
+            "Install first:\n```bash\npip install torch\n```\n\n"
+            "Then:\n```python\nimport torch\nprint(torch.__version__)\n```\n"
+        )
+        
+        assert clean_llm_response(response) == "import torch\nprint(torch.__version__)"
+    
+    def test_single_line_python_fence(self):
+        """Test a fence opened and closed on one line"""
+        assert clean_llm_response("```python import numpy as np```") == "import numpy as np"
+    
+    def test_bare_fence(self):
+        """Test an untagged fence is used when there is no python block"""
+        response = "Here you go:\n```\nimport numpy as np\nx = np.zeros(3)\n```\nDone."
+        
+        assert clean_llm_response(response) == "import numpy as np\nx = np.zeros(3)"
+    
+    def test_tagged_block_preferred_over_bare(self):
+        """Test a later python block beats an earlier untagged one"""
+        response = "```\nsome output\n```\n```py\nx = 1\n```"
+        
+        assert clean_llm_response(response) == "x = 1"
+    
+    def test_no_fence(self):
+        """Test plain responses are returned stripped"""
+        assert clean_llm_response("  x = 1\n") == "x = 1"
@@ -0,0 +1,89 @@
+import pytest
+import tempfile
+import os
+from unittest.mock import patch
+from src.repo_upgrader import _UpgradeCache
+from src.report_generator import FileUpgradeResult
+
+class TestUpgradeCache:
+    
+    def _store_upgrade(self, cache, file_path, source, upgraded):
+        """Simulate a successful upgrade of file_path and cache it"""
+        with open(file_path, 'w') as f:
+            f.write(upgraded)
+        result = FileUpgradeResult(
+            file_path=file_path,
+            success=True,
+            attempts=3,
+            api_changes=["x changed"],
+            diff="diff"
+        )
+        cache.store(source, result)
+        with open(file_path, 'wb') as f:
+            f.write(source)
+    
+    def test_cache_hit(self):
+        """Test a cached upgrade is restored without LLM attempts"""
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as repo_dir:
+            cache = _UpgradeCache(cache_dir)
+            file_path = os.path.join(repo_dir, "model.py")
+            source = b"x = 1\n"
+            self._store_upgrade(cache, file_path, source, "x = 2\n")
+            
+            result = cache.load(file_path, source)
+            
+            assert result is not None
+            assert result.success == True
+            assert result.attempts == 0
+            assert result.api_changes == ["x changed"]
+            with open(file_path, 'r') as f:
+                assert f.read() == "x = 2\n"
+    
+    def test_cache_miss(self):
+        """Test changed source content does not hit the cache"""
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as repo_dir:
+            cache = _UpgradeCache(cache_dir)
+            file_path = os.path.join(repo_dir, "model.py")
+            self._store_upgrade(cache, file_path, b"x = 1\n", "x = 2\n")
+            
+            with open(file_path, 'wb') as f:
+                f.write(b"x = 3\n")
+            
+            assert cache.load(file_path, b"x = 3\n") is None
+            with open(file_path, 'r') as f:
+                assert f.read() == "x = 3\n"
+    
+    def test_cache_invalidated_by_settings(self):
+        """Test a different model setting invalidates cached entries"""
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as repo_dir:
+            file_path = os.path.join(repo_dir, "model.py")
+            source = b"x = 1\n"
+            self._store_upgrade(_UpgradeCache(cache_dir), file_path, source, "x = 2\n")
+            
+            with patch.dict(os.environ, {"ML_UPGRADER_MODEL": "another/model"}):
+                assert _UpgradeCache(cache_dir).load(file_path, source) is None
+    
+    def test_cache_entry_failing_validation(self):
+        """Test a cached upgrade that no longer validates is rolled back and skipped"""
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as repo_dir:
+            cache = _UpgradeCache(cache_dir)
+            file_path = os.path.join(repo_dir, "model.py")
+            source = b"x = 1\n"
+            self._store_upgrade(cache, file_path, source, "x = (\n")
+            
+            assert cache.load(file_path, source) is None
+            with open(file_path, 'rb') as f:
+                assert f.read() == source
+    
+    def test_cache_entry_with_bad_fields(self):
+        """Test a malformed cache entry is treated as a miss"""
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as repo_dir:
+            cache = _UpgradeCache(cache_dir)
+            file_path = os.path.join(repo_dir, "model.py")
+            source = b"x = 1\n"
+            self._store_upgrade(cache, file_path, source, "x = 2\n")
+            
+            with open(cache._entry(file_path, source) + ".json", 'w') as f:
+                f.write('{"unexpected": true}')
+            
+            assert cache.load(file_path, source) is None
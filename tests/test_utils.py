@@ -1,7 +1,9 @@
 import pytest
 import tempfile
 import os
-from src.utils import read_file, write_file, build_prompt, extract_api_changes, generate_diff
+import stat
+from unittest.mock import patch
+from src.utils import read_file, write_file, build_prompt, extract_api_changes, generate_diff, is_probably_binary, iter_python_files, copy_tree
 
 class TestUtils:
     
@@ -76,4 +78,53 @@ result = y.numpy()
         assert "old/test.py" in diff
         assert "new/test.py" in diff
         assert "asscalar" in diff
-        assert "item()" in diff
\ No newline at end of file
+        assert "item()" in diff
+
+    def test_is_probably_binary(self):
+        """Test binary heuristic on text and non-text samples"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            text_path = os.path.join(temp_dir, "text.py")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write("import numpy as np\nprint(np.__version__)\n")
+
+            binary_path = os.path.join(temp_dir, "binary.py")
+            with open(binary_path, "wb") as f:
+                f.write(bytes(range(0x80, 0x100)) * 4)
+
+            assert is_probably_binary(text_path) == False
+            assert is_probably_binary(binary_path) == True
+
+    def test_iter_python_files_prunes_skip_dirs(self):
+        """Test that environment, cache and hidden directories are not walked"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for rel_path in ["main.py", "pkg/model.py", "venv/lib/site.py",
+                             "node_modules/x/setup.py", ".mypy_cache/stub.py",
+                             "__MACOSX/._main.py", "pkg/._model.py", "pkg/notes.txt"]:
+                write_file(os.path.join(temp_dir, rel_path), "")
+
+            found = sorted(os.path.relpath(p, temp_dir) for p in iter_python_files(temp_dir))
+
+            assert found == ["main.py", os.path.join("pkg", "model.py")]
+
+    def test_copy_tree_fallback_with_read_only_directory(self):
+        """Test that the thread-pool fallback copies into read-only directories"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = os.path.join(temp_dir, "src")
+            dst = os.path.join(temp_dir, "dst")
+            read_only = os.path.join(src, "ro")
+            write_file(os.path.join(src, "main.py"), "import ro\n")
+            write_file(os.path.join(read_only, "a.py"), "a = 1\n")
+            write_file(os.path.join(read_only, "nested", "b.py"), "b = 2\n")
+            os.chmod(read_only, 0o555)
+            try:
+                with patch("src.utils.subprocess.run", side_effect=OSError):
+                    copy_tree(src, dst)
+
+                assert read_file(os.path.join(dst, "main.py")) == "import ro\n"
+                assert read_file(os.path.join(dst, "ro", "a.py")) == "a = 1\n"
+                assert read_file(os.path.join(dst, "ro", "nested", "b.py")) == "b = 2\n"
+                assert stat.S_IMODE(os.stat(os.path.join(dst, "ro")).st_mode) == 0o555
+            finally:
+                os.chmod(read_only, 0o755)
+                if os.path.isdir(os.path.join(dst, "ro")):
+                    os.chmod(os.path.join(dst, "ro"), 0o755)
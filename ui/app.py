@@ -12,6 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 # Direct imports
 import repo_upgrader
+import utils
 
 load_dotenv()
 
@@ -215,12 +216,10 @@ def main():
                 
                 # Show repository structure
                 st.subheader("📂 Repository Structure")
-                python_files = []
-                for root, dirs, files in os.walk(old_repo_path):
-                    for file in files:
-                        if file.endswith('.py'):
-                            rel_path = os.path.relpath(os.path.join(root, file), old_repo_path)
-                            python_files.append(rel_path)
+                python_files = [
+                    os.path.relpath(path, old_repo_path)
+                    for path in utils.iter_python_files(old_repo_path)
+                ]
                 
                 st.write(f"Found **{len(python_files)}** Python files:")
                 with st.expander("View files"):
@@ -289,7 +288,8 @@ def main():
                                     runtime_config_path = runtime_temp.name
                                     os.environ["ML_UPGRADER_RUNTIME_CONFIG"] = runtime_config_path
 
-                                report_path = repo_upgrader.upgrade_repo(old_repo_path, new_repo_path)
+                                # The extracted upload is scratch space, so move it rather than copy it
+                                report_path = repo_upgrader.upgrade_repo(old_repo_path, new_repo_path, in_place=True)
                             finally:
                                 if runtime_config_path and os.path.exists(runtime_config_path):
                                     os.unlink(runtime_config_path)
@@ -376,8 +376,7 @@ def main():
             
             finally:
                 # Cleanup
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
+                shutil.rmtree(temp_dir, ignore_errors=True)
 
     # Footer
     st.markdown("---")